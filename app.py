@@ -1,15 +1,338 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Any, AsyncIterator, Iterable, Iterator, Protocol
+
+import diskcache
+import pypdfium2 as pdfium
 import streamlit as st
-import PyPDF2
-from groq import Groq
+from groq import AsyncGroq, Groq
+from openai import AsyncOpenAI, OpenAI
+
+from pdf_text import extract_page_range
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+_PAGE_HEADER_RE = re.compile(r"^### PAGE \d+[^\S\n]*\n?", re.MULTILINE)
+_PAGE_BREAK = "\n\n--- Page Break ---\n\n"
+_FORMAT_ERROR = "Error in formatting extraction"
+_TRANSLATE_ERROR = "Error in translation"
+# Chat completion provider, one of the keys of _BACKENDS
+BACKEND = os.environ.get("LLM_BACKEND", "groq")
+# PDFs at least this large are read by PDFium from a temporary file instead of memory
+LARGE_PDF_BYTES = 20 * 1024 * 1024
+# Directory holding those temporary files, and how many of them are kept
+LARGE_PDF_DIR = os.path.join(tempfile.gettempdir(), "pdf_translator")
+LARGE_PDF_FILES = 4
+# Files used within this many seconds are never evicted, as a session may be reading them
+LARGE_PDF_GRACE_SECONDS = 600
+# Documents with at least this many pages are extracted across worker processes;
+# PDFium takes about a millisecond per page, so smaller ones are not worth the startup
+PARALLEL_EXTRACT_PAGES = 500
+# Maximum number of concurrent LLM requests when processing many pages
+N_PARALLEL = int(os.environ.get("LLM_PARALLEL", "8"))
+# Number of pages combined into a single LLM request when translating a document
+MARSHAL_PAGES = int(os.environ.get("LLM_MARSHAL_PAGES", "4"))
+# Pages are only combined while the prompt stays under this many characters, so the
+# Malayalam output (far more tokens than the English source) fits the token budget;
+# longer pages get a request of their own
+MARSHAL_MAX_CHARS = int(os.environ.get("LLM_MARSHAL_CHARS", "1800"))
+
+_SYSTEM_FORMAT = (
+    "You are a language expert who formats the extraction. "
+    "Improve readability while maintaining the original structure."
+)
+_SYSTEM_MALAYALAM = (
+    "You are a professional translator. Translate the following text "
+    "to Malayalam while maintaining the original meaning and structure. "
+    "Use Malayalam script."
+)
+_SYSTEM_MALAYALAM_PAGES = _SYSTEM_MALAYALAM + (
+    " The text is split into pages, each starting with a '### PAGE <n>' header. "
+    "Translate every page and repeat each '### PAGE <n>' header unchanged, "
+    "on its own line, before its translation."
+)
+
+
+class TruncatedResponseError(RuntimeError):
+    """Raised when a response stops at the completion token limit."""
+
+    def __init__(self) -> None:
+        super().__init__("the response was cut off at the completion token limit")
+
+
+class LLMBackend(Protocol):
+    """A chat completion provider with an OpenAI-style streaming API."""
+
+    default_model: str
+    small_model: str
+
+    def stream_chat(self, system: str, user: str, model: str) -> Iterable[str]:
+        """
+        Stream the raw response text deltas for a system and user prompt.
+
+        Raises TruncatedResponseError after the last delta if the response
+        ended on the token limit, so that it is never cached.
+        """
+        ...
+
+    def async_client(self) -> Any:
+        """
+        Return a new async client for ``astream_chat``.
+
+        Async clients are bound to the event loop they are used on, so callers
+        create one per ``asyncio.run`` and share it across that run's requests.
+        """
+        ...
+
+    def astream_chat(
+        self, client: Any, system: str, user: str, model: str
+    ) -> AsyncIterator[str]:
+        """Async counterpart of ``stream_chat``, running on a client from ``async_client``."""
+        ...
+
+
+class _ChatCompletionsBackend:
+    """Shared implementation for SDKs that mirror the OpenAI chat completions API."""
+
+    default_model: str
+    small_model: str
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    def stream_chat(self, system: str, user: str, model: str) -> Iterator[str]:
+        completion = self._client.chat.completions.create(
+            **_chat_request(system, user, model)
+        )
+        for chunk in completion:
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.choices[0].finish_reason == "length":
+                raise TruncatedResponseError()
+
+    async def astream_chat(
+        self, client: Any, system: str, user: str, model: str
+    ) -> AsyncIterator[str]:
+        completion = await client.chat.completions.create(
+            **_chat_request(system, user, model)
+        )
+        async for chunk in completion:
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.choices[0].finish_reason == "length":
+                raise TruncatedResponseError()
+
+
+class GroqBackend(_ChatCompletionsBackend):
+    """Chat completions served by Groq."""
+
+    default_model = "deepseek-r1-distill-llama-70b"
+    small_model = "llama-3.1-8b-instant"
+
+    def __init__(self, api_key: str = "") -> None:
+        self._api_key = api_key
+        super().__init__(Groq(api_key=api_key) if api_key else Groq())
+
+    def async_client(self) -> AsyncGroq:
+        return AsyncGroq(api_key=self._api_key) if self._api_key else AsyncGroq()
+
+
+class OpenAIBackend(_ChatCompletionsBackend):
+    """Chat completions served by OpenAI."""
+
+    default_model = "gpt-4o-mini"
+    small_model = "gpt-4o-mini"
+
+    def __init__(self, api_key: str = "") -> None:
+        self._api_key = api_key
+        super().__init__(OpenAI(api_key=api_key) if api_key else OpenAI())
+
+    def async_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(api_key=self._api_key) if self._api_key else AsyncOpenAI()
+
+
+_BACKENDS: dict[str, type[LLMBackend]] = {"groq": GroqBackend, "openai": OpenAIBackend}
+if BACKEND not in _BACKENDS:
+    raise ValueError(f"Unknown LLM_BACKEND {BACKEND!r}; expected one of {sorted(_BACKENDS)}")
+MODEL = os.environ.get("LLM_MODEL") or _BACKENDS[BACKEND].default_model
+SMALL_MODEL = os.environ.get("LLM_SMALL_MODEL") or _BACKENDS[BACKEND].small_model
+# Inputs shorter than this many characters are sent to SMALL_MODEL
+SMALL_INPUT_CHARS = 2000
+
+
+def _model_for(text: str) -> str:
+    """Return the model to use for ``text``: the small model for short inputs."""
+    return SMALL_MODEL if len(text) < SMALL_INPUT_CHARS else MODEL
+
+
+def _budget(system: str, text: str, model: str) -> int:
+    """
+    Return the completion token budget for a prompt sent to ``model``.
+
+    The reasoning model needs room for its <think> block, and Malayalam takes
+    many more tokens than the English source, so those requests keep the full
+    4096 tokens. Formatting on the small model is capped at about four times
+    the input's token count so short inputs cannot decode up to the limit.
+    """
+    if model != SMALL_MODEL or system.startswith(_SYSTEM_MALAYALAM):
+        return 4096
+    return max(1024, min(4096, len(text)))
+
+
+def _cache_key(system: str, text: str, model: str | None = None) -> str:
+    """Build the response cache key for a prompt sent to ``model`` (routed by default)."""
+    model = model or _model_for(text)
+    digest = hashlib.blake2b(f"{system}\0{text}".encode()).hexdigest()
+    return f"{model}:{digest}"
+
+
+@st.cache_resource
+def _get_backend(api_key: str) -> LLMBackend:
+    """Return the configured backend, shared across reruns and sessions for ``api_key``."""
+    return _BACKENDS[BACKEND](api_key)
+
+
+@st.cache_resource
+def _get_response_cache() -> diskcache.Cache:
+    """Return the store of completed LLM responses, persisted across sessions and restarts."""
+    return diskcache.Cache(".llm_cache")
+
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the executor that translates speculatively while the user reads the formatted text."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+@st.cache_resource
+def _get_prefetches() -> dict[str, Future]:
+    """
+    Return the in-flight background translations, keyed by response cache key.
+
+    Futures remove themselves once done; their results are then served from the
+    response cache, so no translated text is held here or in session state.
+    """
+    return {}
+
+
+def _pdf_source(pdf_bytes: bytes) -> bytes | str:
+    """
+    Return what to hand to PDFium for an uploaded PDF.
+
+    Small PDFs are used as bytes. Large ones are written once to a temporary
+    file named after their content hash, so PDFium reads pages from disk on
+    demand and extraction workers receive a path rather than a copy of the bytes.
+    Every call marks the file as used. Only the LARGE_PDF_FILES most recently
+    used files are kept, except that files used within LARGE_PDF_GRACE_SECONDS
+    are never evicted; an evicted file is written again the next time its PDF
+    is used.
+
+    Args:
+        pdf_bytes: The raw PDF contents.
 
+    Returns:
+        Either ``pdf_bytes`` or the path of the temporary file.
+    """
+    if len(pdf_bytes) < LARGE_PDF_BYTES:
+        return pdf_bytes
+    digest = hashlib.blake2b(pdf_bytes).hexdigest()
+    path = os.path.join(LARGE_PDF_DIR, f"{digest}.pdf")
+    try:
+        # Mark as recently used
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        # Never written, or evicted by another session
+        pass
+    os.makedirs(LARGE_PDF_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=LARGE_PDF_DIR, suffix=".tmp", delete=False) as f:
+        f.write(pdf_bytes)
+    os.replace(f.name, path)
+    # Evict the least recently used files beyond the limit. Other sessions may
+    # be removing files at the same time, so vanished files are skipped
+    cached = []
+    for entry in os.scandir(LARGE_PDF_DIR):
+        if entry.name.endswith(".pdf"):
+            try:
+                cached.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass
+    cached.sort(reverse=True)
+    cutoff = time.time() - LARGE_PDF_GRACE_SECONDS
+    for mtime, cached_path in cached[LARGE_PDF_FILES:]:
+        if cached_path != path and mtime < cutoff:
+            try:
+                os.remove(cached_path)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+@st.cache_resource
+def _get_pdfium_lock() -> threading.Lock:
+    """
+    Return the lock guarding in-process PDFium calls.
+
+    PDFium is not thread-safe and Streamlit runs each session's script in its
+    own thread, so every PDFium call made in this process holds this lock.
+    """
+    return threading.Lock()
 
-def extract_all_text(pdf_reader: PyPDF2.PdfReader) -> str:
+
+@st.cache_data(show_spinner=False)
+def count_pages(pdf: bytes | str) -> int:
+    """Return the number of pages in a PDF given as bytes or a file path."""
+    with _get_pdfium_lock():
+        doc = pdfium.PdfDocument(pdf)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+
+@st.cache_data(show_spinner=False)
+def extract_page(pdf: bytes | str, index: int) -> str:
+    """Extract text from the page at zero-based ``index``."""
+    with _get_pdfium_lock():
+        return extract_page_range(pdf, index, index + 1)[0]
+
+
+@st.cache_data(show_spinner=False)
+def extract_pages(pdf: bytes | str) -> list[str]:
+    """Extract text from all pages, in parallel for long documents, one string per page."""
+    num_pages = count_pages(pdf)
+    workers = min(os.cpu_count() or 1, num_pages)
+    if num_pages < PARALLEL_EXTRACT_PAGES or workers == 1:
+        with _get_pdfium_lock():
+            return extract_page_range(pdf, 0, num_pages)
+    # Each worker parses the PDF once and handles a contiguous run of pages
+    step = -(-num_pages // workers)
+    starts = range(0, num_pages, step)
+    stops = [min(start + step, num_pages) for start in starts]
+    # Spawn rather than fork: forking Streamlit's multi-threaded server can deadlock
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        chunks = executor.map(extract_page_range, repeat(pdf), starts, stops)
+        return [page_text for chunk in chunks for page_text in chunk]
+
+
+@st.cache_data(show_spinner=False)
+def extract_all_text(pdf: bytes | str) -> str:
     """Extract text from all pages and return as a single string."""
-    text = []
-    for page in pdf_reader.pages:
-        text.append(page.extract_text())
-    return "\n\n--- Page Break ---\n\n".join(text)
+    return _PAGE_BREAK.join(extract_pages(pdf))
 
 
 def remove_think_tags(text: str) -> str:
@@ -22,13 +345,104 @@ def remove_think_tags(text: str) -> str:
     Returns:
         The cleaned text with <think></think> content removed.
     """
-    # Remove everything between <think> and </think> (including the tags)
-    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
+    # Same cleaning as the streaming paths: an unclosed <think> (a response
+    # cut off mid-reasoning) drops everything after it
+    return "".join(_iter_clean([text])).strip()
+
+
+def _iter_clean(deltas: Iterable[str]) -> Iterator[str]:
+    """
+    Yield streamed response text with <think></think> sections dropped.
+
+    Tags can be split across deltas, so a trailing partial tag is carried over
+    to the next delta instead of being emitted.
+
+    Args:
+        deltas: The response text as it is streamed by an LLM backend.
+
+    Yields:
+        Pieces of the response text outside of <think> tags.
+    """
+    in_think = False
+    carry = ""
+    for delta in deltas:
+        buf = carry + delta
+        carry = ""
+        while buf:
+            tag = _THINK_CLOSE if in_think else _THINK_OPEN
+            idx = buf.find(tag)
+            if idx >= 0:
+                if not in_think and idx:
+                    yield buf[:idx]
+                buf = buf[idx + len(tag):]
+                in_think = not in_think
+                continue
+            # Hold back the longest suffix that could be the start of the tag
+            keep = next(
+                (k for k in range(len(tag) - 1, 0, -1) if buf.endswith(tag[:k])), 0
+            )
+            if not in_think and len(buf) > keep:
+                yield buf[:len(buf) - keep]
+            carry = buf[len(buf) - keep:] if keep else ""
+            break
+    if carry and not in_think:
+        yield carry
+
+
+def _chat_request(system: str, text: str, model: str | None = None) -> dict:
+    """Build the arguments of a streaming chat completion request (model routed by default)."""
+    model = model or _model_for(text)
+    return dict(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": text}
+        ],
+        temperature=0.7,
+        max_completion_tokens=_budget(system, text, model),
+        top_p=0.95,
+        stream=True,
+        stop=None,
+    )
+
+
+def _llm_stream(
+    system: str, text: str, api_key: str, model: str | None = None
+) -> Iterator[str]:
+    """Stream a chat completion with <think></think> sections dropped (model routed by default)."""
+    model = model or _model_for(text)
+    return _iter_clean(_get_backend(api_key).stream_chat(system, text, model))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _llm_chat(system: str, text: str, model: str, _api_key: str) -> str:
+    """
+    Run a chat completion on the configured backend and return the cleaned response.
+
+    The on-disk response cache is consulted first. Errors are raised rather
+    than returned so that they are never cached.
+
+    Args:
+        system: The system prompt.
+        text: The user text.
+        model: The model to use.
+        _api_key: API key for authentication; excluded from the cache key.
+
+    Returns:
+        The response text with <think></think> content removed.
+    """
+    key = _cache_key(system, text, model)
+    cached = _get_response_cache().get(key)
+    if cached is not None:
+        return cached
+    result = "".join(_llm_stream(system, text, _api_key, model)).strip()
+    _get_response_cache().set(key, result)
+    return result
 
 
 def format_extraction(text: str, api_key: str = "") -> str:
     """
-    Format the extracted text using the Groq API.
+    Format the extracted text using the configured LLM backend (Groq by default).
 
     Args:
         text: The text to be formatted.
@@ -38,38 +452,14 @@ def format_extraction(text: str, api_key: str = "") -> str:
         A string of the formatted extraction.
     """
     try:
-        client = Groq(api_key=api_key) if api_key else Groq()
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a language expert who formats the extraction. "
-                    "Improve readability while maintaining the original structure."
-                )
-            },
-            {"role": "user", "content": text}
-        ]
-        completion = client.chat.completions.create(
-            model="deepseek-r1-distill-llama-70b",
-            messages=messages,
-            temperature=0.7,
-            max_completion_tokens=4096,
-            top_p=0.95,
-            stream=True,
-            stop=None,
-        )
-        formatted_response = ""
-        for chunk in completion:
-            formatted_response += chunk.choices[0].delta.content or ""
-        # Remove reasoning parts enclosed in <think> tags
-        return remove_think_tags(formatted_response)
+        return _llm_chat(_SYSTEM_FORMAT, text, _model_for(text), api_key)
     except Exception as e:
-        return f"Error in formatting extraction: {str(e)}"
+        return f"{_FORMAT_ERROR}: {str(e)}"
 
 
 def translate_to_malayalam(text: str, api_key: str = "") -> str:
     """
-    Translate text to Malayalam using the Groq API.
+    Translate text to Malayalam using the configured LLM backend (Groq by default).
 
     Args:
         text: The text to be translated.
@@ -79,40 +469,281 @@ def translate_to_malayalam(text: str, api_key: str = "") -> str:
         A string containing the Malayalam translation.
     """
     try:
-        client = Groq(api_key=api_key) if api_key else Groq()
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a professional translator. Translate the following text "
-                    "to Malayalam while maintaining the original meaning and structure. "
-                    "Use Malayalam script."
-                )
-            },
-            {"role": "user", "content": text}
-        ]
-        completion = client.chat.completions.create(
-            model="deepseek-r1-distill-llama-70b",
-            messages=messages,
-            temperature=0.7,
-            max_completion_tokens=4096,
-            top_p=0.95,
-            stream=True,
-            stop=None,
-        )
-        translation_response = ""
-        for chunk in completion:
-            translation_response += chunk.choices[0].delta.content or ""
-        # Remove reasoning parts enclosed in <think> tags
-        return remove_think_tags(translation_response)
+        return _llm_chat(_SYSTEM_MALAYALAM, text, _model_for(text), api_key)
     except Exception as e:
-        return f"Error in translation: {str(e)}"
+        return f"{_TRANSLATE_ERROR}: {str(e)}"
+
+
+def _stream_chat(system: str, text: str, api_key: str, error_prefix: str) -> Iterator[str]:
+    """
+    Stream a cleaned LLM response piece by piece, for display with st.write_stream.
+
+    Cached responses are yielded in one piece; fresh ones are stored in the
+    response cache once the stream completes.
+
+    Args:
+        system: The system prompt.
+        text: The user text.
+        api_key: (Optional) API key for authentication.
+        error_prefix: Prefix of the message yielded if the request fails.
+
+    Yields:
+        Pieces of the response text outside of <think> tags.
+    """
+    key = _cache_key(system, text)
+    cached = _get_response_cache().get(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    try:
+        for piece in _llm_stream(system, text, api_key):
+            # Skip the whitespace that usually follows a closing </think> tag
+            if not parts:
+                piece = piece.lstrip()
+                if not piece:
+                    continue
+            parts.append(piece)
+            yield piece
+    except Exception as e:
+        # Keep the message apart from any partial text already shown
+        yield f"\n\n{error_prefix}: {str(e)}" if parts else f"{error_prefix}: {str(e)}"
+        return
+    _get_response_cache().set(key, "".join(parts).strip())
+
+
+def _stream_format(text: str, api_key: str = "") -> Iterator[str]:
+    """Stream the formatted extraction of ``text``."""
+    return _stream_chat(_SYSTEM_FORMAT, text, api_key, _FORMAT_ERROR)
+
+
+def _stream_translate(text: str, api_key: str = "") -> Iterator[str]:
+    """Stream the Malayalam translation of ``text``."""
+    return _stream_chat(_SYSTEM_MALAYALAM, text, api_key, _TRANSLATE_ERROR)
+
+
+async def _async_chat(backend: LLMBackend, client: Any, system: str, user: str) -> str:
+    """Run one streaming chat completion on an async client and return the cleaned text."""
+    model = _model_for(user)
+    key = _cache_key(system, user, model)
+    cached = _get_response_cache().get(key)
+    if cached is not None:
+        return cached
+    parts = [delta async for delta in backend.astream_chat(client, system, user, model)]
+    # Clean the same way as the sync paths, which share this cache key
+    result = "".join(_iter_clean(parts)).strip()
+    _get_response_cache().set(key, result)
+    return result
+
+
+async def _format_many(texts: list[str], api_key: str = "") -> list[str]:
+    """
+    Format several texts concurrently using the backend's async client.
+
+    Args:
+        texts: The texts to be formatted, e.g. one per page.
+        api_key: (Optional) API key for authentication.
+
+    Returns:
+        The formatted extractions, in the same order as ``texts``.
+    """
+    semaphore = asyncio.Semaphore(N_PARALLEL)
+    try:
+        backend = _get_backend(api_key)
+        client = backend.async_client()
+    except Exception as e:
+        # e.g. no API key entered or configured
+        return [f"{_FORMAT_ERROR}: {str(e)}"] * len(texts)
+
+    async with client:
+        async def _one(text: str) -> str:
+            async with semaphore:
+                try:
+                    return await _async_chat(backend, client, _SYSTEM_FORMAT, text)
+                except Exception as e:
+                    return f"{_FORMAT_ERROR}: {str(e)}"
+
+        return await asyncio.gather(*[_one(text) for text in texts])
+
+
+def _marshal_pages(
+    pages: list[str], k: int = MARSHAL_PAGES, max_chars: int = MARSHAL_MAX_CHARS
+) -> Iterator[list[str]]:
+    """
+    Group consecutive pages so that up to ``k`` of them share one prompt.
+
+    Pages are only combined while the group stays within ``max_chars``, so
+    long pages are sent on their own and translated concurrently instead.
+
+    Args:
+        pages: The text of each page.
+        k: The maximum number of pages per group.
+        max_chars: The maximum combined size of a group.
+
+    Yields:
+        Lists of consecutive pages.
+    """
+    group: list[str] = []
+    size = 0
+    for page in pages:
+        if group and (len(group) == k or size + len(page) > max_chars):
+            yield group
+            group, size = [], 0
+        group.append(page)
+        size += len(page)
+    if group:
+        yield group
+
+
+def _marshal_prompt(group: list[str]) -> str:
+    """Combine pages into one prompt, each introduced by a '### PAGE <n>' header."""
+    return "\n\n".join(f"### PAGE {i}\n{page}" for i, page in enumerate(group, start=1))
+
+
+def _unmarshal_pages(response: str, count: int) -> list[str] | None:
+    """
+    Split a response to a marshaled prompt back into its pages.
+
+    Returns None if the model did not echo exactly ``count`` page headers,
+    rather than guessing at page boundaries.
+    """
+    parts = _PAGE_HEADER_RE.split(response)[1:]
+    if len(parts) != count:
+        return None
+    return [part.strip() for part in parts]
+
+
+async def _translate_pages(pages: list[str], api_key: str = "") -> list[str]:
+    """
+    Translate pages to Malayalam, short pages several per request and requests concurrently.
+
+    A group whose combined response fails, is cut off, or cannot be split back
+    into its pages is retried one page per request, so the result always has
+    one entry per page.
+
+    Args:
+        pages: The text of each page.
+        api_key: (Optional) API key for authentication.
+
+    Returns:
+        The translated pages in order.
+    """
+    semaphore = asyncio.Semaphore(N_PARALLEL)
+    try:
+        backend = _get_backend(api_key)
+        client = backend.async_client()
+    except Exception as e:
+        # e.g. no API key entered or configured
+        return [f"{_TRANSLATE_ERROR}: {str(e)}"] * len(pages)
+
+    async with client:
+        async def _page(page: str) -> str:
+            async with semaphore:
+                try:
+                    return await _async_chat(backend, client, _SYSTEM_MALAYALAM, page)
+                except Exception as e:
+                    return f"{_TRANSLATE_ERROR}: {str(e)}"
+
+        async def _group(group: list[str]) -> list[str]:
+            if len(group) == 1:
+                return [await _page(group[0])]
+            async with semaphore:
+                try:
+                    response = await _async_chat(
+                        backend, client, _SYSTEM_MALAYALAM_PAGES, _marshal_prompt(group)
+                    )
+                except Exception:
+                    response = None
+            translated = _unmarshal_pages(response, len(group)) if response else None
+            if translated is None:
+                # The semaphore is released first so the retries can acquire it
+                return list(await asyncio.gather(*[_page(page) for page in group]))
+            return translated
+
+        groups = await asyncio.gather(*[_group(group) for group in _marshal_pages(pages)])
+    return [page for group in groups for page in group]
+
+
+def translate_document(text: str, api_key: str = "") -> str:
+    """
+    Translate a multi-page document to Malayalam.
+
+    The text is split on page breaks and the pages are translated concurrently,
+    so long documents are not truncated by a single response's token limit.
+
+    Args:
+        text: The document text, with pages separated by page breaks.
+        api_key: (Optional) API key for authentication.
+
+    Returns:
+        The Malayalam translation, with pages separated by page breaks.
+    """
+    pages = text.split(_PAGE_BREAK)
+    if len(pages) == 1:
+        return translate_to_malayalam(text, api_key)
+    try:
+        return _PAGE_BREAK.join(asyncio.run(_translate_pages(pages, api_key)))
+    except Exception as e:
+        return f"{_TRANSLATE_ERROR}: {str(e)}"
+
+
+def _formatted_page(page_number: int, raw_text: str) -> str | None:
+    """
+    Return the formatted extraction of a page if it was formatted in this session.
+
+    Session state only records the response cache key of each formatted page;
+    the text itself is looked up in the response cache. A key recorded for
+    different page text (e.g. from a previously uploaded PDF) is ignored.
+    """
+    key = _cache_key(_SYSTEM_FORMAT, raw_text)
+    if st.session_state.get('formatted_hashes', {}).get(page_number) != key:
+        return None
+    return _get_response_cache().get(key)
+
+
+def _prefetch_translation(raw_text: str, api_key: str) -> None:
+    """
+    Start translating the formatted extraction of ``raw_text`` in the background.
+
+    Nothing is started if formatting failed (failures are not cached) or the
+    translation is already cached or in flight.
+    """
+    formatted_text = _get_response_cache().get(_cache_key(_SYSTEM_FORMAT, raw_text))
+    if formatted_text is None:
+        return
+    futures = _get_prefetches()
+    key = _cache_key(_SYSTEM_MALAYALAM, formatted_text)
+    if key not in futures and key not in _get_response_cache():
+        future = _get_executor().submit(translate_document, formatted_text, api_key)
+        futures[key] = future
+        future.add_done_callback(lambda _: futures.pop(key, None))
+
+
+def _show_translation(text: str, api_key: str, height: int) -> str:
+    """
+    Display the Malayalam translation of ``text`` and return it.
+
+    Single-page text is streamed into the page as it arrives. A prefetched
+    translation, or a multi-page document translated page by page with
+    translate_document, only arrives once complete, so a spinner is shown
+    while waiting and the result is displayed in a text area.
+    """
+    future = _get_prefetches().get(_cache_key(_SYSTEM_MALAYALAM, text))
+    if future is None and _PAGE_BREAK not in text:
+        return st.write_stream(_stream_translate(text, api_key))
+    with st.spinner("Translating to Malayalam..."):
+        if future is not None:
+            malayalam_text = future.result()
+        else:
+            malayalam_text = translate_document(text, api_key)
+    st.text_area("Malayalam Content", malayalam_text, height=height)
+    return malayalam_text
 
 
 def main() -> None:
     st.title("PDF Viewer App with Extraction Formatting and Malayalam Translation")
 
-    # API Key input widget (for Groq API, if required)
+    # API Key input widget (for the LLM backend, if required)
     api_key = st.text_input("Enter API Key (if required)", type="password")
 
     # File uploader widget
@@ -130,8 +761,9 @@ def main() -> None:
 
         # Read PDF content
         try:
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            num_pages = len(pdf_reader.pages)
+            # Large files are handed to PDFium by path rather than as bytes
+            pdf = _pdf_source(uploaded_file.getvalue())
+            num_pages = count_pages(pdf)
 
             st.write(f"Number of pages: {num_pages}")
 
@@ -143,7 +775,7 @@ def main() -> None:
 
             if view_mode == "Complete Document":
                 # Extract text
-                raw_text = extract_all_text(pdf_reader)
+                raw_text = extract_all_text(pdf)
 
                 # Create tabs for raw, formatted extraction, and translated content
                 tab1, tab2, tab3 = st.tabs(
@@ -157,10 +789,17 @@ def main() -> None:
                 with tab2:
                     st.subheader("Formatted Extraction")
                     if st.button("Format Extraction"):
-                        with st.spinner("Formatting extraction..."):
-                            formatted_text = format_extraction(raw_text, api_key)
+                        st.write_stream(_stream_format(raw_text, api_key))
+                        # Only successful responses are cached; on failure or a cut-off
+                        # response, translation falls back to the raw text
+                        formatted_text = _get_response_cache().get(
+                            _cache_key(_SYSTEM_FORMAT, raw_text)
+                        )
+                        if formatted_text is None:
+                            st.session_state.pop('formatted_text', None)
+                        else:
                             st.session_state['formatted_text'] = formatted_text
-                            st.text_area("Formatted Extraction", formatted_text, height=400)
+                            _prefetch_translation(raw_text, api_key)
                             # Add download button
                             st.download_button(
                                 label="Download Formatted Extraction",
@@ -172,20 +811,35 @@ def main() -> None:
                 with tab3:
                     st.subheader("Malayalam Translation")
                     if st.button("Translate to Malayalam"):
-                        with st.spinner("Translating to Malayalam..."):
-                            # Use formatted extraction if available, otherwise use raw text
-                            text_to_translate = st.session_state.get('formatted_text', raw_text)
-                            malayalam_text = translate_to_malayalam(text_to_translate, api_key)
-                            st.text_area("Malayalam Content", malayalam_text, height=400)
-                            # Add download button for Malayalam text
-                            st.download_button(
-                                label="Download Malayalam Translation",
-                                data=malayalam_text.encode("utf-8"),
-                                file_name=f"{uploaded_file.name}_malayalam.txt",
-                                mime="text/plain"
-                            )
+                        # Use formatted extraction if available, otherwise use raw text
+                        text_to_translate = st.session_state.get('formatted_text', raw_text)
+                        malayalam_text = _show_translation(text_to_translate, api_key, 400)
+                        # Add download button for Malayalam text
+                        st.download_button(
+                            label="Download Malayalam Translation",
+                            data=malayalam_text.encode("utf-8"),
+                            file_name=f"{uploaded_file.name}_malayalam.txt",
+                            mime="text/plain"
+                        )
 
             else:
+                if st.button("Format All Pages"):
+                    with st.spinner(f"Formatting {num_pages} pages..."):
+                        page_texts = extract_pages(pdf)
+                        formatted_pages = asyncio.run(_format_many(page_texts, api_key))
+                        # Results live in the response cache; only remember their keys
+                        formatted_hashes = st.session_state.setdefault('formatted_hashes', {})
+                        failures = []
+                        for i, (page_text, formatted_text) in enumerate(
+                            zip(page_texts, formatted_pages), start=1
+                        ):
+                            if formatted_text.startswith(_FORMAT_ERROR):
+                                failures.append((i, formatted_text))
+                            else:
+                                formatted_hashes[i] = _cache_key(_SYSTEM_FORMAT, page_text)
+                    for i, error in failures:
+                        st.warning(f"Page {i}: {error}")
+
                 # Add a page selector
                 page_number = st.number_input(
                     "Select a page",
@@ -195,8 +849,7 @@ def main() -> None:
                 )
 
                 # Get page content
-                page = pdf_reader.pages[page_number - 1]
-                raw_text = page.extract_text()
+                raw_text = extract_page(pdf, page_number - 1)
 
                 # Create tabs for raw, formatted extraction, and translated content
                 tab1, tab2, tab3 = st.tabs(
@@ -210,21 +863,20 @@ def main() -> None:
                 with tab2:
                     st.subheader(f"Formatted Extraction - Page {page_number}")
                     if st.button("Format Extraction"):
-                        with st.spinner("Formatting extraction..."):
-                            formatted_text = format_extraction(raw_text, api_key)
-                            st.session_state[f'formatted_text_page_{page_number}'] = formatted_text
-                            st.text_area("Formatted Extraction", formatted_text, height=300)
+                        st.write_stream(_stream_format(raw_text, api_key))
+                        st.session_state.setdefault('formatted_hashes', {})[page_number] = (
+                            _cache_key(_SYSTEM_FORMAT, raw_text)
+                        )
+                        _prefetch_translation(raw_text, api_key)
+                    elif formatted_text := _formatted_page(page_number, raw_text):
+                        st.text_area("Formatted Extraction", formatted_text, height=300)
 
                 with tab3:
                     st.subheader(f"Malayalam Translation - Page {page_number}")
                     if st.button("Translate to Malayalam"):
-                        with st.spinner("Translating to Malayalam..."):
-                            # Use formatted extraction if available, otherwise use raw text
-                            text_to_translate = st.session_state.get(
-                                f'formatted_text_page_{page_number}', raw_text
-                            )
-                            malayalam_text = translate_to_malayalam(text_to_translate, api_key)
-                            st.text_area("Malayalam Content", malayalam_text, height=300)
+                        # Use formatted extraction if available, otherwise use raw text
+                        text_to_translate = _formatted_page(page_number, raw_text) or raw_text
+                        _show_translation(text_to_translate, api_key, 300)
 
         except Exception as e:
             st.error(f"Error processing PDF: {str(e)}")
@@ -0,0 +1,30 @@
+"""
+PDF text extraction run inside worker processes.
+
+This lives outside app.py because Streamlit executes app.py as ``__main__``,
+which spawned worker processes cannot import; functions sent to them must
+come from a regular module.
+"""
+import pypdfium2 as pdfium
+
+
+def extract_page_range(pdf: bytes | str, start: int, stop: int) -> list[str]:
+    """
+    Extract text from pages [start, stop) of a PDF given as bytes or a file path.
+
+    PDFium is not thread-safe: callers in a multi-threaded process must
+    serialize calls, while worker processes may call this freely.
+    """
+    doc = pdfium.PdfDocument(pdf)
+    try:
+        text = []
+        for i in range(start, stop):
+            page = doc[i]
+            textpage = page.get_textpage()
+            # PDFium ends lines with CRLF; normalise to match the rest of the app
+            text.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return text
+    finally:
+        doc.close()